@@ -3,7 +3,6 @@ use std::collections::BinaryHeap;
 use std::time::Instant;
 
 use rand::seq::IteratorRandom;
-use rand::{rngs::SmallRng, SeedableRng};
 
 use super::Agent;
 use crate::env::*;
@@ -151,7 +150,7 @@ impl Agent for MobilityAgent {
         }
 
         println!(">>> random");
-        let mut rng = SmallRng::from_entropy();
+        let mut rng = rand::thread_rng();
         MoveResponse::new(
             self.game
                 .valid_moves(0)
@@ -10,7 +10,7 @@ use crate::game::{alphabeta, max_n, Comparable, FloodFill, Game, Outcome};
 
 use crate::util::argmax;
 
-use rand::{rngs::SmallRng, seq::IteratorRandom, SeedableRng};
+use rand::seq::IteratorRandom;
 
 /// Configuration of the tree search heuristic.
 #[derive(Debug, Clone, serde::Serialize, serde::Deserialize)]
@@ -276,7 +276,7 @@ impl Agent for TreeAgent {
 
         println!(">>> random");
 
-        let mut rng = SmallRng::from_entropy();
+        let mut rng = rand::thread_rng();
         MoveResponse::new(
             game.valid_moves(0)
                 .choose(&mut rng)
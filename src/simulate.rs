@@ -6,9 +6,10 @@ use snork_core::game::*;
 
 use rand::prelude::*;
 use rand::seq::IteratorRandom;
+use std::io::{self, BufRead};
 use std::time::Instant;
 
-use std::sync::mpsc;
+use std::sync::{mpsc, Arc};
 use threadpool::ThreadPool;
 
 #[derive(structopt::StructOpt)]
@@ -31,16 +32,23 @@ struct Opts {
     jobs: usize,
     #[structopt(short, long)]
     verbose: bool,
+    /// Comma separated seeds for the game setup and food spawning.
+    /// `game_count` games are played for every seed.
+    #[structopt(long, require_delimiter = true)]
+    seeds: Vec<u64>,
+    /// Keep running and read the agent configs as JSON arrays line by line
+    /// from stdin, instead of simulating a single set of agents.
+    #[structopt(long, conflicts_with = "agents")]
+    server: bool,
 
     agents: Vec<Config>,
 }
 
-fn init_game(width: usize, height: usize, num_agents: usize) -> Game {
-    let mut rng = rand::thread_rng();
+fn init_game(width: usize, height: usize, num_agents: usize, rng: &mut SmallRng) -> Game {
     let start_positions = (0..width * height)
         .filter(|i| i % 2 == 0)
         .map(|i| Vec2D::new((i % width) as i16, (i / width) as i16))
-        .choose_multiple(&mut rng, num_agents);
+        .choose_multiple(rng, num_agents);
 
     let snakes = start_positions
         .iter()
@@ -66,7 +74,7 @@ fn init_game(width: usize, height: usize, num_agents: usize) -> Game {
         .iter()
         .map(|&p| snake.head() + p)
         .filter(|&p| game.grid.has(p) && game.grid[p] == Cell::Free)
-        .choose(&mut rng);
+        .choose(rng);
         if let Some(p) = p {
             game.grid[p] = Cell::Food;
         }
@@ -121,14 +129,15 @@ fn game_to_request(game: &Game, turn: usize) -> GameRequest {
 
 fn play_game(
     agents: &[Config],
+    seed: u64,
     width: usize,
     height: usize,
     runtime: usize,
     food_rate: f64,
     verbose: bool,
 ) -> bool {
-    let mut rng = rand::thread_rng();
-    let mut game = init_game(width, height, agents.len());
+    let mut rng = SmallRng::seed_from_u64(seed);
+    let mut game = init_game(width, height, agents.len(), &mut rng);
     let mut request = game_to_request(&game, 0);
     let agents = agents
         .iter()
@@ -186,41 +195,109 @@ fn play_game(
     false
 }
 
-fn main() {
-    let Opts {
-        runtime,
-        width,
-        height,
-        food_rate,
-        game_count,
-        jobs,
-        verbose,
-        agents,
-    } = Opts::from_args();
-
-    assert!(agents.len() <= 4, "Only up to 4 snakes are supported");
+/// Returns the seeds of all games that should be played.
+/// Without any given seeds the games are initialized randomly.
+fn game_seeds(seeds: &[u64], game_count: usize) -> Vec<u64> {
+    if seeds.is_empty() {
+        return (0..game_count).map(|_| random()).collect();
+    }
+    let mut game_seeds = Vec::with_capacity(seeds.len() * game_count);
+    for &seed in seeds {
+        let mut rng = SmallRng::seed_from_u64(seed);
+        game_seeds.extend((0..game_count).map(|_| rng.gen::<u64>()));
+    }
+    game_seeds
+}
 
+fn simulate(pool: &ThreadPool, opts: &Opts, agents: &[Config]) {
     let start = Instant::now();
 
-    let pool = ThreadPool::new(jobs);
+    let (width, height, runtime, food_rate, verbose) = (
+        opts.width,
+        opts.height,
+        opts.runtime,
+        opts.food_rate,
+        opts.verbose,
+    );
+
+    // Shared by all games instead of being cloned for each of them
+    let agents: Arc<[Config]> = agents.into();
+    let seeds = game_seeds(&opts.seeds, opts.game_count);
+    let game_count = seeds.len();
+
     let (tx, rx) = mpsc::channel();
-    for _ in 0..game_count {
+    for seed in seeds {
         let tx = tx.clone();
         let agents = agents.clone();
         pool.execute(move || {
             tx.send(play_game(
-                &agents, width, height, runtime, food_rate, verbose,
+                &agents, seed, width, height, runtime, food_rate, verbose,
             ))
             .unwrap();
         })
     }
     drop(tx);
 
-    let wins = rx.iter().filter(|x| *x).count();
+    // Games that panicked drop their sender without a result
+    let results = rx.iter().collect::<Vec<_>>();
+    let wins = results.iter().filter(|x| **x).count();
 
     println!(
         "Simulation time: {}ms",
         (Instant::now() - start).as_millis()
     );
-    println!("Result: {}/{}", wins, game_count);
+    if results.len() < game_count {
+        println!("Error: {} games failed", game_count - results.len());
+    } else {
+        println!("Result: {}/{}", wins, game_count);
+    }
+}
+
+fn main() {
+    let opts = Opts::from_args();
+
+    let pool = ThreadPool::new(opts.jobs);
+
+    if opts.server {
+        let stdin = io::stdin();
+        for line in stdin.lock().lines() {
+            let line = match line {
+                Ok(line) => line,
+                Err(e) => {
+                    println!("Error: {}", e);
+                    continue;
+                }
+            };
+            if line.trim().is_empty() {
+                continue;
+            }
+            match serde_json::from_str::<Vec<Config>>(&line) {
+                Ok(agents) if agents.is_empty() => println!("Error: No snakes given"),
+                Ok(agents) if agents.len() <= 4 => simulate(&pool, &opts, &agents),
+                Ok(_) => println!("Error: Only up to 4 snakes are supported"),
+                Err(e) => println!("Error: {}", e),
+            }
+        }
+    } else {
+        assert!(!opts.agents.is_empty(), "No snakes given");
+        assert!(opts.agents.len() <= 4, "Only up to 4 snakes are supported");
+        simulate(&pool, &opts, &opts.agents);
+    }
+}
+
+#[cfg(test)]
+mod test {
+    #[test]
+    fn seed_expansion() {
+        use super::*;
+
+        let seeds = game_seeds(&[42, 5], 3);
+        assert_eq!(seeds.len(), 6);
+        assert_eq!(seeds, game_seeds(&[42, 5], 3));
+        // Every seed starts its own sequence
+        assert_eq!(&seeds[..3], &game_seeds(&[42], 3)[..]);
+        assert_eq!(&seeds[3..], &game_seeds(&[5], 3)[..]);
+
+        assert_eq!(game_seeds(&[], 4).len(), 4);
+    }
 }